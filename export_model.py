@@ -1,8 +1,13 @@
 # export_model.py
 import tensorflow as tf
 import tensorflow_hub as hub
+from tensorflow_serving.apis import model_pb2, predict_pb2, prediction_log_pb2
+import numpy as np
+from PIL import Image
+import glob
 import os
 import shutil
+import tempfile
 
 print("=" * 60)
 print("TensorFlow Model Export Script (Fixed)")
@@ -19,6 +24,19 @@ if os.path.exists(save_path):
 
 os.makedirs(save_path, exist_ok=True)
 
+# INT8 (TFLite) variant is written next to the float model
+int8_save_path = "models/mobilenet_int8/1"
+calibration_dir = os.getenv("CALIBRATION_DIR")
+calibration_steps = 100
+
+# TF-TRT FP16 variant for GPU deployments (only built when a GPU is visible)
+trt_save_path = "models/mobilenet_trt/1"
+
+# Batch sizes replayed at model load so every shape XLA compiles for is ready
+# before the first real request. Keep in sync with allowed_batch_sizes in
+# models/batching.cfg
+warmup_batch_sizes = [1, 2, 4, 8, 16, 32]
+
 print("Downloading MobileNetV2 from TensorFlow Hub...")
 print("This may take a few minutes...")
 print()
@@ -32,30 +50,181 @@ hub_module = hub.load(model_url)
 print("Model loaded successfully!")
 print()
 
-# Create a concrete function with proper signature
+# Float entry point: [0,1] normalized images, used as the quantization source
 @tf.function(input_signature=[tf.TensorSpec(shape=[None, 224, 224, 3], dtype=tf.float32, name='inputs')])
-def serving_fn(inputs):
+def classify_fn(inputs):
     return hub_module(inputs)
 
+# Serving entry point: raw uint8 pixels, normalized in-graph so clients send
+# 1 byte per channel instead of a float32. jit_compile fuses the network into
+# XLA kernels; the batch dimension stays dynamic because TF Serving merges
+# requests, but batching.cfg pads every batch to one of a few fixed sizes so
+# XLA only ever compiles those shapes. TF Serving must be started with
+# --xla_cpu_compilation_enabled=true to run it (see docker-compose.yml)
+@tf.function(
+    input_signature=[tf.TensorSpec(shape=[None, 224, 224, 3], dtype=tf.uint8, name='inputs')],
+    jit_compile=True
+)
+def serving_fn(inputs):
+    return hub_module(tf.cast(inputs, tf.float32) * (1.0 / 255.0))
+
+# Trace the serving function once here and hand the concrete function to
+# save(), so it is not traced a second time during export
+serving_concrete_fn = serving_fn.get_concrete_function()
+
+# Lower the function to HLO for every batch size the server pads to, so an op
+# without an XLA kernel or a shape XLA cannot handle fails the export rather
+# than surfacing later in TF Serving. This only checks the graph: serving it
+# still needs TF Serving started with --xla_cpu_compilation_enabled=true
+print(f"Checking XLA compilation for batch sizes {warmup_batch_sizes}...")
+for batch_size in warmup_batch_sizes:
+    serving_fn.experimental_get_compiler_ir(
+        tf.zeros([batch_size, 224, 224, 3], dtype=tf.uint8)
+    )(stage='hlo')
+
 # Save with proper serving signature
 print(f"Saving model with serving signature to {save_path}...")
 tf.saved_model.save(
     hub_module,
     save_path,
     signatures={
-        'serving_default': serving_fn
-    }
+        'serving_default': serving_concrete_fn
+    },
+    options=tf.saved_model.SaveOptions(
+        experimental_custom_gradients=False,
+        save_debug_info=False
+    )
 )
 
+# TF Serving replays these requests when it loads the model, so kernel
+# compilation and allocator setup happen before traffic arrives
+warmup_path = os.path.join(save_path, "assets.extra", "tf_serving_warmup_requests")
+print(f"Writing {len(warmup_batch_sizes)} warmup requests to {warmup_path}...")
+os.makedirs(os.path.dirname(warmup_path), exist_ok=True)
+with tf.io.TFRecordWriter(warmup_path) as writer:
+    for batch_size in warmup_batch_sizes:
+        warmup_request = predict_pb2.PredictRequest(
+            model_spec=model_pb2.ModelSpec(name="mobilenet", signature_name="serving_default")
+        )
+        warmup_request.inputs["inputs"].CopyFrom(
+            tf.make_tensor_proto(np.zeros((batch_size, 224, 224, 3), dtype=np.uint8))
+        )
+        log = prediction_log_pb2.PredictionLog(
+            predict_log=prediction_log_pb2.PredictLog(request=warmup_request)
+        )
+        writer.write(log.SerializeToString())
+
+
+# Full-integer quantization needs a representative set of distinct images;
+# calibrating on a handful would produce activation ranges that do not
+# generalize, so the INT8 export is skipped instead
+calibration_paths = []
+if calibration_dir:
+    calibration_paths = sorted(
+        glob.glob(os.path.join(calibration_dir, "*.jpg")) +
+        glob.glob(os.path.join(calibration_dir, "*.jpeg")) +
+        glob.glob(os.path.join(calibration_dir, "*.png"))
+    )[:calibration_steps]
+
+
+# Representative dataset: calibration images resized and scaled to [0,1]
+# like gateway inputs
+def representative_dataset():
+    for path in calibration_paths:
+        image = Image.open(path).convert('RGB').resize((224, 224), Image.Resampling.BILINEAR)
+        image_array = np.array(image, dtype=np.float32) / 255.0
+        yield [np.expand_dims(image_array, axis=0)]
+
+int8_exported = False
+print()
+if len(calibration_paths) < calibration_steps:
+    print(
+        f"⚠️  Skipping INT8 export: CALIBRATION_DIR must contain at least "
+        f"{calibration_steps} distinct images (found {len(calibration_paths)})"
+    )
+else:
+    print(f"Quantizing to INT8 with {len(calibration_paths)} calibration images from {calibration_dir}...")
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [classify_fn.get_concrete_function()],
+        hub_module
+    )
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # uint8 input: the [0,1] scaling is folded into the input quantization
+    # parameters, so callers can feed raw 0-255 pixels
+    converter.inference_input_type = tf.uint8
+    tflite_model = converter.convert()
+
+    if os.path.exists(int8_save_path):
+        print(f"Removing old INT8 model at {int8_save_path}...")
+        shutil.rmtree(int8_save_path)
+    os.makedirs(int8_save_path, exist_ok=True)
+
+    with open(os.path.join(int8_save_path, "model.tflite"), "wb") as f:
+        f.write(tflite_model)
+    int8_exported = True
+
+trt_exported = False
+if tf.config.list_physical_devices('GPU'):
+    print()
+    print(f"Converting to TF-TRT FP16 at {trt_save_path}...")
+    try:
+        from tensorflow.python.compiler.tensorrt import trt_convert as trt
+
+        # TF-TRT cannot segment a function XLA must compile, so convert from a
+        # copy of the serving function without jit_compile. The temporary
+        # directory is removed even when conversion fails
+        with tempfile.TemporaryDirectory() as trt_source_path:
+            trt_source_fn = tf.function(serving_fn.python_function, input_signature=serving_fn.input_signature)
+            tf.saved_model.save(
+                hub_module,
+                trt_source_path,
+                signatures={'serving_default': trt_source_fn.get_concrete_function()}
+            )
+
+            trt_converter = trt.TrtGraphConverterV2(
+                input_saved_model_dir=trt_source_path,
+                precision_mode=trt.TrtPrecisionMode.FP16,
+                max_workspace_size_bytes=1 << 30,
+                maximum_cached_engines=len(warmup_batch_sizes)
+            )
+            trt_converter.convert()
+
+            # Build engines for every batch size the server can form, so no engine
+            # is built on a live request
+            def trt_input_fn():
+                for batch_size in warmup_batch_sizes:
+                    yield (tf.zeros([batch_size, 224, 224, 3], dtype=tf.uint8),)
+
+            trt_converter.build(input_fn=trt_input_fn)
+
+            if os.path.exists(trt_save_path):
+                print(f"Removing old TF-TRT model at {trt_save_path}...")
+                shutil.rmtree(trt_save_path)
+            trt_converter.save(trt_save_path)
+        trt_exported = True
+    except Exception as e:
+        print(f"⚠️  TF-TRT conversion failed, skipping: {e}")
+else:
+    print()
+    print("No GPU found, skipping TF-TRT FP16 export")
+
 print()
 print("✅ Model exported successfully with serving signature!")
 print(f"📁 Model location: {os.path.abspath(save_path)}")
 print()
 print("Model details:")
-print(f"  - Input: 224x224 RGB images (float32, normalized [0,1])")
+print(f"  - Input: 224x224 RGB images (uint8, 0-255; normalized in-graph)")
 print(f"  - Output: 1001 class probabilities (ImageNet classes)")
 print(f"  - Format: TensorFlow SavedModel with 'serving_default' signature")
 print(f"  - Signature name: serving_default")
+print(f"  - XLA: jit_compile=True, verified for batch sizes {warmup_batch_sizes}")
+print(f"  - Warmup: batch sizes {warmup_batch_sizes} replayed on load")
+if int8_exported:
+    print(f"  - INT8 variant: {os.path.abspath(int8_save_path)}/model.tflite (uint8 input, 0-255)")
+if trt_exported:
+    print(f"  - TF-TRT FP16 variant: {os.path.abspath(trt_save_path)}")
 print()
 print("Next steps:")
 print("  1. Restart docker: docker-compose down && docker-compose up")
@@ -1,30 +1,179 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-import requests
+from fastapi.responses import ORJSONResponse, Response
+import httpx
+import orjson
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+import grpc
+import cv2
 import numpy as np
-from PIL import Image
-import io
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2, prediction_service_pb2_grpc
+import asyncio
+import concurrent.futures
+import os
 import logging
-from datetime import datetime
+import time
+from typing import List
 
 # Setup logging
-logging.basicConfig(level=logging.INFO)
+# LOG_LEVEL defaults to INFO for local runs; the container sets WARNING so
+# the per-request INFO lines below are skipped on the hot path. Those calls
+# pass arguments lazily, so nothing is formatted when the level is off
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="ML Inference Gateway",
     description="Gateway for TensorFlow Serving - MobileNetV2 Image Classification",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-TF_SERVING_URL = "http://tf-serving:8501/v1/models/mobilenet:predict"
+MODEL_NAME = "mobilenet"
+TF_SERVING_GRPC_TARGET = os.getenv("TF_SERVING_GRPC_TARGET", "tf-serving:8500")
+TF_SERVING_REST_URL = os.getenv("TF_SERVING_REST_URL", "http://tf-serving:8501/v1/models/mobilenet")
+
+# Uvicorn worker processes; also what `python app.py` starts
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# CPU-bound image decoding/resizing runs here so it never blocks the event loop.
+# OpenCV releases the GIL, so threads give real parallelism. Every Uvicorn
+# worker has its own pool, so by default the cores are split across
+# WEB_CONCURRENCY workers instead of each worker claiming all of them.
+PREPROCESS_THREADS = int(os.getenv(
+    "PREPROCESS_THREADS",
+    max(1, os.cpu_count() // WEB_CONCURRENCY)
+))
+preprocess_pool = concurrent.futures.ThreadPoolExecutor(max_workers=PREPROCESS_THREADS)
+
+# Clients are created on startup and shared across requests so connections to
+# TF Serving are reused instead of being re-established per call.
+# The gRPC message cap is raised from 4MB to leave headroom for batched tensors.
+grpc_channel = None
+prediction_stub = None
+http_client = None
+
+# Request coalescing: concurrent /predict calls are queued and shipped to
+# TF Serving as one (B, 224, 224, 3) tensor. A batch is sent once it holds
+# MAX_BATCH images or BATCH_WAIT_MS has passed since its first image.
+# The queue is bounded so overload is shed with 503s instead of latency.
+MAX_BATCH = int(os.getenv("MAX_BATCH", "16"))
+BATCH_WAIT_MS = float(os.getenv("BATCH_WAIT_MS", "5"))
+MAX_QUEUE_SIZE = int(os.getenv("MAX_QUEUE_SIZE", "256"))
+
+batch_queue = None
+batch_worker_task = None
+inflight_batches = set()
+
+# Pool of reusable PredictRequests with dtype and image dims already set, so
+# a batch only fills in its size and pixel bytes. The batch worker takes one
+# after the first image of a batch arrives and before it drains the rest of
+# the queue, so at most MAX_INFLIGHT_BATCHES coalesced batches are in flight.
+# Beyond that, images wait in batch_queue (and get 503 once it is full)
+# rather than in an unbounded set of pending tasks.
+MAX_INFLIGHT_BATCHES = int(os.getenv("MAX_INFLIGHT_BATCHES", "8"))
+
+request_pool = None
+
+# Uploads larger than this are rejected with 413 before they are read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+# Most images /predict_batch accepts; must not exceed max_batch_size in
+# models/batching.cfg, since the whole batch goes to TF Serving in one call
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", "32"))
+
+# Prometheus metrics. With several Uvicorn workers, PROMETHEUS_MULTIPROC_DIR
+# must be set so each worker writes its samples there and /metrics can sum
+# them; otherwise the default registry is used. The multiprocess registry has
+# no process metrics, so uptime comes from START_TIME (earliest worker start)
+REQUESTS = Counter("ml_requests_total", "Prediction requests received")
+ERRORS = Counter("ml_errors_total", "Prediction requests that failed")
+INFERENCE_LATENCY = Histogram(
+    "ml_inference_ms",
+    "Time from queueing an image to receiving its prediction, in milliseconds",
+    buckets=(5, 10, 25, 50, 100, 250, 500)
+)
+BATCH_INFERENCE_LATENCY = Histogram(
+    "ml_batch_inference_ms",
+    "Time for one /predict_batch TF Serving call covering every uploaded image, in milliseconds",
+    buckets=(10, 25, 50, 100, 250, 500, 1000, 2500)
+)
+START_TIME = Gauge(
+    "ml_gateway_start_time_seconds",
+    "Unix time the gateway started; uptime is time() minus this",
+    multiprocess_mode="min"
+)
+START_TIME.set(time.time())
+
+@app.on_event("startup")
+async def startup():
+    """Open the shared gRPC channel and HTTP client, start the batch worker"""
+    global grpc_channel, prediction_stub, http_client, batch_queue, batch_worker_task, request_pool
+
+    grpc_channel = grpc.aio.insecure_channel(
+        TF_SERVING_GRPC_TARGET,
+        options=[
+            ("grpc.max_send_message_length", 64 * 1024 * 1024),
+            ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+        ]
+    )
+    prediction_stub = prediction_service_pb2_grpc.PredictionServiceStub(grpc_channel)
+    http_client = httpx.AsyncClient(
+        timeout=5,
+        headers={"Connection": "keep-alive"},
+        transport=httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            retries=2
+        )
+    )
+    request_pool = asyncio.Queue()
+    for _ in range(MAX_INFLIGHT_BATCHES):
+        request_pool.put_nowait(_new_predict_request())
+    batch_queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+    batch_worker_task = asyncio.create_task(_batch_worker())
+
+    # One throwaway prediction connects the gRPC channel up front, so the
+    # first real request does not pay for connection setup
+    try:
+        await _predict([np.zeros((224, 224, 3), dtype=np.uint8)])
+        logger.info("Warmup prediction succeeded")
+    except grpc.RpcError as e:
+        logger.warning(f"Warmup prediction failed: {e.code().name} {e.details()}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop the batch worker and close connections to TF Serving"""
+    batch_worker_task.cancel()
+    await grpc_channel.close()
+    await http_client.aclose()
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject requests whose declared body size exceeds a limit before the body is parsed
 
-# Metrics tracking (simple in-memory for demo)
-metrics = {
-    "requests_total": 0,
-    "errors_total": 0,
-    "start_time": datetime.now()
-}
+    Plain ASGI rather than @app.middleware("http"), which would wrap every
+    request (including /predict) in an extra task and stream
+    """
+
+    def __init__(self, app, max_bytes):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_bytes:
+                        response = ORJSONResponse(
+                            status_code=413,
+                            content={"detail": f"Upload too large. Limit is {self.max_bytes} bytes"}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES)
 
 @app.get("/")
 def root():
@@ -36,24 +185,23 @@ def root():
         "endpoints": {
             "health": "GET /health - Service health check",
             "predict": "POST /predict - Image classification",
-            "metrics": "GET /metrics - Service metrics",
+            "predict_batch": "POST /predict_batch - Classify several images in one call",
+            "metrics": "GET /metrics - Prometheus metrics",
             "model_info": "GET /model - Model information"
         },
         "usage": {
-            "predict": "curl -X POST -F 'file=@image.jpg' http://localhost:8000/predict"
+            "predict": "curl -X POST -F 'file=@image.jpg' http://localhost:8000/predict",
+            "predict_batch": "curl -X POST -F 'files=@a.jpg' -F 'files=@b.jpg' http://localhost:8000/predict_batch"
         }
     }
 
 @app.get("/health")
-def health():
+async def health():
     """Health check endpoint - verifies TF Serving connectivity"""
     try:
-        response = requests.get(
-            "http://tf-serving:8501/v1/models/mobilenet",
-            timeout=5
-        )
+        response = await http_client.get(TF_SERVING_REST_URL)
         if response.status_code == 200:
-            model_status = response.json()
+            model_status = orjson.loads(response.content)
             return {
                 "status": "healthy",
                 "gateway": "operational",
@@ -64,7 +212,7 @@ def health():
             raise Exception(f"TF Serving returned status {response.status_code}")
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
@@ -75,101 +223,258 @@ def health():
         )
 
 @app.get("/model")
-def model_info():
+async def model_info():
     """Get model metadata from TF Serving"""
     try:
-        response = requests.get(
-            "http://tf-serving:8501/v1/models/mobilenet/metadata",
-            timeout=5
-        )
-        return response.json()
+        response = await http_client.get(f"{TF_SERVING_REST_URL}/metadata")
+        return orjson.loads(response.content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get model info: {str(e)}")
 
-@app.post("/predict")
-async def predict(file: UploadFile = File(...)):
+def _preprocess(image_data):
     """
-    Classify an image using MobileNetV2
+    Decode and resize an uploaded image into a model input tensor
 
     Args:
-        file: Image file (JPEG, PNG)
+        image_data: Raw image bytes (JPEG, PNG)
 
     Returns:
-        Top 5 predictions with class IDs and probabilities
+        Tuple of (uint8 array of shape (224, 224, 3), (width, height) of the
+        original image), or None if the bytes are not a decodable image
+    """
+    # imdecode raises on an empty buffer rather than returning None
+    if not image_data:
+        return None
+
+    # IMREAD_COLOR drops alpha and expands grayscale to 3 channels
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+
+    # Store original size for response (width x height)
+    original_size = (image.shape[1], image.shape[0])
+
+    # Resize to 224x224 (MobileNetV2 input requirement). Pixels stay uint8:
+    # the model normalizes to [0, 1] in-graph, and the batch dimension is
+    # added when requests are coalesced
+    image_array = cv2.resize(image, (224, 224), interpolation=cv2.INTER_AREA)
+
+    # OpenCV decodes to BGR; the model expects RGB. Swapping channels after the
+    # resize touches 224x224 pixels instead of the full upload, and dst= does
+    # it in place without another allocation
+    cv2.cvtColor(image_array, cv2.COLOR_BGR2RGB, dst=image_array)
+
+    return image_array, original_size
+
+def _new_predict_request():
+    """Create a serving_default PredictRequest with the uint8 (B, 224, 224, 3) input preset"""
+    grpc_request = predict_pb2.PredictRequest()
+    grpc_request.model_spec.name = MODEL_NAME
+    grpc_request.model_spec.signature_name = "serving_default"
+    input_tensor = grpc_request.inputs["inputs"]
+    input_tensor.dtype = tf.uint8.as_datatype_enum
+    for size in (0, 224, 224, 3):
+        input_tensor.tensor_shape.dim.add(size=size)
+    return grpc_request
+
+async def _send_predict(grpc_request, images):
+    """
+    Run one TF Serving prediction on a PredictRequest taken from the pool
+
+    Args:
+        grpc_request: PredictRequest from _new_predict_request
+        images: List of uint8 arrays of shape (224, 224, 3)
+
+    Returns:
+        float32 array of shape (len(images), 1001) with class probabilities
+    """
+    input_tensor = grpc_request.inputs["inputs"]
+    input_tensor.tensor_shape.dim[0].size = len(images)
+    # The tensor travels as raw uint8 bytes; joining the image buffers
+    # straight into the proto field is the only copy made
+    input_tensor.tensor_content = b"".join(images)
+    response = await prediction_stub.Predict(grpc_request, timeout=30.0)
+
+    return tf.make_ndarray(response.outputs["output_0"])
+
+async def _predict(images):
+    """
+    Run one TF Serving prediction on a free pooled PredictRequest
+
+    Args:
+        images: List of uint8 arrays of shape (224, 224, 3)
+
+    Returns:
+        float32 array of shape (len(images), 1001) with class probabilities
+
+    Raises:
+        HTTPException: 503 if every pooled request is in flight
+    """
+    # Shed load like /predict does rather than queueing on the pool, where
+    # waiters would also delay the batch worker's next request
+    try:
+        grpc_request = request_pool.get_nowait()
+    except asyncio.QueueEmpty:
+        raise HTTPException(status_code=503, detail="Server overloaded, retry later")
+    try:
+        return await _send_predict(grpc_request, images)
+    finally:
+        request_pool.put_nowait(grpc_request)
+
+async def _batch_worker():
+    """Drain the request queue into batches and dispatch each batch"""
+    loop = asyncio.get_running_loop()
+    while True:
+        # Wait for a free PredictRequest before draining the rest of the queue.
+        # While every request is in flight the queue fills up, and once it is
+        # full /predict sheds load with 503s instead of building an unbounded
+        # backlog. The first image is taken before the request so an idle
+        # worker does not hold a pool slot
+        items = [await batch_queue.get()]
+        grpc_request = await request_pool.get()
+        deadline = loop.time() + BATCH_WAIT_MS / 1000
+        while len(items) < MAX_BATCH:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(batch_queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # Dispatch without waiting so the next batch can form while this one is in flight
+        task = asyncio.create_task(_run_batch(grpc_request, items))
+        inflight_batches.add(task)
+        task.add_done_callback(inflight_batches.discard)
+
+async def _run_batch(grpc_request, items):
     """
-    metrics["requests_total"] += 1
+    Send one batch to TF Serving and resolve each request's future
 
+    Args:
+        grpc_request: Pooled PredictRequest reserved by the batch worker;
+            returned to the pool once the call finishes
+        items: List of (image array, future) pairs taken from the queue
+    """
     try:
-        # Validate file type
-        if not file.content_type or not file.content_type.startswith('image/'):
+        logger.info("Sending batch of %d to TF Serving: %s", len(items), TF_SERVING_GRPC_TARGET)
+        try:
+            predictions = await _send_predict(grpc_request, [image_array for image_array, _ in items])
+        except grpc.RpcError as e:
+            logger.error(f"TF Serving error: {e.code().name} {e.details()}")
             raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file type: {file.content_type}. Must be an image (JPEG, PNG)"
+                status_code=500,
+                detail=f"TF Serving error: {e.details()}"
             )
+    except Exception as e:
+        for _, future in items:
+            if not future.done():
+                future.set_exception(e)
+        return
+    finally:
+        request_pool.put_nowait(grpc_request)
+
+    # Requests whose client went away have cancelled futures; skip those
+    for (_, future), pred_array in zip(items, predictions):
+        if not future.done():
+            future.set_result(pred_array)
+
+def _validate_upload(file):
+    """
+    Check an upload's content type and size before it is read
 
-        logger.info(f"Processing image: {file.filename} ({file.content_type})")
-
-        # Read and preprocess image
-        image_data = await file.read()
-        image = Image.open(io.BytesIO(image_data))
-
-        # Store original size for response
-        original_size = image.size
+    Args:
+        file: Uploaded file
 
-        # Convert to RGB if needed (handles RGBA, grayscale, etc.)
-        if image.mode != 'RGB':
-            logger.info(f"Converting image from {image.mode} to RGB")
-            image = image.convert('RGB')
+    Raises:
+        HTTPException: 400 for non-image content types, 413 for oversized files
+    """
+    if not file.content_type or not file.content_type.startswith('image/'):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type for {file.filename}: {file.content_type}. Must be an image (JPEG, PNG)"
+        )
 
-        # Resize to 224x224 (MobileNetV2 input requirement)
-        image = image.resize((224, 224), Image.Resampling.LANCZOS)
+    # Chunked uploads carry no Content-Length; check the spooled size too
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload too large. Limit is {MAX_UPLOAD_BYTES} bytes"
+        )
 
-        # Convert to numpy array and normalize to [0, 1]
-        image_array = np.array(image, dtype=np.float32) / 255.0
+def _top_5(predictions):
+    """
+    Pick the 5 most likely classes for each image in a batch
 
-        # Add batch dimension: (224, 224, 3) -> (1, 224, 224, 3)
-        image_array = np.expand_dims(image_array, axis=0)
+    Args:
+        predictions: float32 array of shape (B, 1001) with class probabilities
 
-        logger.info(f"Image preprocessed - shape: {image_array.shape}, dtype: {image_array.dtype}")
+    Returns:
+        List of B lists of 5 prediction dicts, highest probability first
+    """
+    # argpartition finds each row's top 5 in O(N); only those 5 are then sorted
+    top_indices = np.argpartition(predictions, -5, axis=1)[:, -5:]
+    top_probs = np.take_along_axis(predictions, top_indices, axis=1)
+    order = np.argsort(top_probs, axis=1)[:, ::-1]
+    top_indices = np.take_along_axis(top_indices, order, axis=1)
+    top_probs = np.take_along_axis(top_probs, order, axis=1)
+
+    return [
+        [
+            {
+                "class_id": int(idx),
+                "probability": float(prob),
+                "confidence_percent": round(float(prob) * 100, 2)
+            }
+            for idx, prob in zip(row_indices, row_probs)
+        ]
+        for row_indices, row_probs in zip(top_indices, top_probs)
+    ]
 
-        # Prepare payload for TensorFlow Serving
-        payload = {
-            "instances": image_array.tolist()
-        }
+@app.post("/predict")
+async def predict(file: UploadFile = File(...)):
+    """
+    Classify an image using MobileNetV2
 
-        # Call TensorFlow Serving
-        logger.info(f"Sending request to TF Serving: {TF_SERVING_URL}")
-        start_time = datetime.now()
+    Args:
+        file: Image file (JPEG, PNG)
 
-        response = requests.post(
-            TF_SERVING_URL,
-            json=payload,
-            timeout=30
-        )
+    Returns:
+        Top 5 predictions with class IDs and probabilities
+    """
+    REQUESTS.inc()
 
-        inference_time = (datetime.now() - start_time).total_seconds() * 1000
-        logger.info(f"Inference completed in {inference_time:.2f}ms")
+    try:
+        _validate_upload(file)
 
-        if response.status_code != 200:
-            logger.error(f"TF Serving error: {response.text}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"TF Serving error: {response.text}"
-            )
+        logger.info("Processing image: %s (%s)", file.filename, file.content_type)
 
-        predictions_response = response.json()
+        # Read upload, then decode/resize off the event loop. The bytes are
+        # wrapped by np.frombuffer without another copy
+        image_data = await file.read()
+        loop = asyncio.get_running_loop()
+        preprocessed = await loop.run_in_executor(preprocess_pool, _preprocess, image_data)
+        if preprocessed is None:
+            raise HTTPException(status_code=400, detail="Could not decode image")
+        image_array, original_size = preprocessed
+
+        logger.info("Image preprocessed - shape: %s, dtype: %s", image_array.shape, image_array.dtype)
+
+        # Queue for the next batch and wait for this image's row of the result
+        future = loop.create_future()
+        try:
+            batch_queue.put_nowait((image_array, future))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Server overloaded, retry later")
+
+        start_time = time.perf_counter_ns()
+        pred_array = await future
+        inference_time = (time.perf_counter_ns() - start_time) / 1e6
+        INFERENCE_LATENCY.observe(inference_time)
+        logger.info("Inference completed in %.2fms", inference_time)
 
         # Process predictions - get top 5 classes
-        pred_array = np.array(predictions_response['predictions'][0])
-        top_5_indices = np.argsort(pred_array)[-5:][::-1]
-
-        results = []
-        for idx in top_5_indices:
-            results.append({
-                "class_id": int(idx),
-                "probability": float(pred_array[idx]),
-                "confidence_percent": round(float(pred_array[idx]) * 100, 2)
-            })
+        results = _top_5(pred_array[np.newaxis, :])[0]
 
         return {
             "success": True,
@@ -185,35 +490,114 @@ async def predict(file: UploadFile = File(...)):
         }
 
     except HTTPException:
-        metrics["errors_total"] += 1
+        ERRORS.inc()
         raise
     except Exception as e:
-        metrics["errors_total"] += 1
+        ERRORS.inc()
         logger.error(f"Prediction error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/metrics")
-def get_metrics():
+@app.post("/predict_batch")
+async def predict_batch(files: List[UploadFile] = File(...)):
     """
-    Service metrics endpoint
-    In production, integrate with Prometheus
+    Classify several images with a single TF Serving call
+
+    Args:
+        files: Image files (JPEG, PNG), at most MAX_BATCH_FILES
+
+    Returns:
+        Top 5 predictions for each image, in upload order
     """
-    uptime = (datetime.now() - metrics["start_time"]).total_seconds()
+    REQUESTS.inc()
 
-    return {
-        "service": "ml-inference-gateway",
-        "model": "mobilenet",
-        "model_version": "1",
-        "requests_total": metrics["requests_total"],
-        "errors_total": metrics["errors_total"],
-        "success_rate": round(
-            (metrics["requests_total"] - metrics["errors_total"]) / max(metrics["requests_total"], 1) * 100,
-            2
-        ),
-        "uptime_seconds": round(uptime, 2),
-        "uptime_hours": round(uptime / 3600, 2)
-    }
+    try:
+        if len(files) > MAX_BATCH_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many files: {len(files)}. Limit is {MAX_BATCH_FILES}"
+            )
+        for file in files:
+            _validate_upload(file)
+
+        logger.info("Processing batch of %d images", len(files))
+
+        # Decode/resize all images in parallel on the preprocessing pool
+        loop = asyncio.get_running_loop()
+        images_data = [await file.read() for file in files]
+        preprocessed = await asyncio.gather(*[
+            loop.run_in_executor(preprocess_pool, _preprocess, image_data)
+            for image_data in images_data
+        ])
+        for file, item in zip(files, preprocessed):
+            if item is None:
+                raise HTTPException(status_code=400, detail=f"Could not decode image: {file.filename}")
+
+        # The upload is already a batch, so it bypasses the /predict coalescer
+        start_time = time.perf_counter_ns()
+        try:
+            predictions = await _predict([image_array for image_array, _ in preprocessed])
+        except grpc.RpcError as e:
+            logger.error(f"TF Serving error: {e.code().name} {e.details()}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"TF Serving error: {e.details()}"
+            )
+        inference_time = (time.perf_counter_ns() - start_time) / 1e6
+        BATCH_INFERENCE_LATENCY.observe(inference_time)
+        logger.info("Batch inference completed in %.2fms", inference_time)
+
+        results = [
+            {
+                "filename": file.filename,
+                "original_size": f"{original_size[0]}x{original_size[1]}",
+                "predictions": top_5
+            }
+            for file, (_, original_size), top_5 in zip(files, preprocessed, _top_5(predictions))
+        ]
+
+        return {
+            "success": True,
+            "count": len(results),
+            "inference_time_ms": round(inference_time, 2),
+            "results": results,
+            "model": {
+                "name": "mobilenet",
+                "version": "1"
+            },
+            "note": "Class IDs correspond to ImageNet labels. Top prediction is first."
+        }
+
+    except HTTPException:
+        ERRORS.inc()
+        raise
+    except Exception as e:
+        ERRORS.inc()
+        logger.error(f"Batch prediction error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics endpoint (text exposition format)"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 if __name__ == "__main__":
+    import tempfile
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    # Several workers need a shared multiprocess dir, or /metrics only
+    # reports whichever worker answers the scrape
+    if WEB_CONCURRENCY > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=WEB_CONCURRENCY,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
\ No newline at end of file